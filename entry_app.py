@@ -5,21 +5,49 @@ import numpy as np
 from src.detector import PersonDetector
 from src.reid import ReIdentifier
 from src.database import Database
+from src.client import RecognitionClient
+from src.gallery import Gallery
+from src.enrollment import StrangerBuffer, EnrollmentQueue
 
 import argparse
 
+def complete_registration(gallery, reid, use_server, name, features):
+    """Store a named registration and push it into the live gallery."""
+    existing = gallery.find_by_name(name)
+    pid = None
+    for feat in features:
+        if use_server:
+            # Server writes the DB and updates its own gallery; mirror it locally
+            pid = reid.enroll(name, embedding=feat)
+            gallery.push(pid, feat)
+        else:
+            pid = gallery.enroll(name, feat)
+
+    if existing:
+        print(f"Added {len(features)} new embeddings for existing person {name} (ID: {pid}).")
+    else:
+        print(f"Registered {name} (ID: {pid}) with {len(features)} embeddings.")
+
 def main():
     # Configuration
     parser = argparse.ArgumentParser()
     parser.add_argument("--source", type=str, default="0", help="Camera Source (0, 1, or video file)")
+    parser.add_argument("--server", type=str, default=None, help="Use a running recognition server (host:port or unix:/path) instead of loading models")
     args = parser.parse_args()
     
     SOURCE = int(args.source) if args.source.isdigit() else args.source
     MATCH_THRESHOLD = 0.6
     
     detector = PersonDetector()
-    reid = ReIdentifier()
+    reid = RecognitionClient(args.server) if args.server else ReIdentifier()
     db = Database() 
+    gallery = Gallery(db)
+    
+    # Registration runs alongside recognition: strangers' best features are
+    # buffered per track and names are entered on a background thread.
+    strangers = StrangerBuffer()
+    enrollments = EnrollmentQueue()
+    pending_tracks = set()
     
     cap = cv2.VideoCapture(SOURCE)
     if not cap.isOpened():
@@ -41,8 +69,19 @@ def main():
         
         tracks = detector.track(frame_resized)
         
-        # Get all known people once per loop (or cache it)
-        known_persons = db.get_all_embeddings()
+        # Keep the in-memory gallery in sync with IN/OUT changes from the exit camera
+        gallery.refresh_status()
+        
+        # Finish registrations whose name has been entered
+        for track_id, name, features in enrollments.poll():
+            pending_tracks.discard(track_id)
+            if not name:
+                print("Cancelled.")
+                continue
+            try:
+                complete_registration(gallery, reid, bool(args.server), name, features)
+            except (OSError, RuntimeError) as e:
+                print(f"Registration of {name} failed: {e}")
         
         # Draw tracks & Identify
         for track in tracks:
@@ -52,22 +91,13 @@ def main():
             # Extract feature
             current_feature = reid.extract_features(frame_resized, bbox)
             
-            best_match_name = "Stranger"
-            max_sim = 0.0
-            best_match_id = None
+            # Compare against ALL embeddings of all known persons
+            matched_person, max_sim = gallery.match(current_feature)
             is_known = False
             
-            if current_feature is not None and known_persons:
-                for person in known_persons:
-                    # Compare against ALL embeddings for this person
-                    for emb in person['embeddings']:
-                        sim = reid.compute_similarity(current_feature, emb)
-                        if sim > max_sim:
-                            max_sim = sim
-                            best_match_id = person['id']
-                            best_match_name = person['name']
-            
-            if max_sim > MATCH_THRESHOLD:
+            if matched_person is not None and max_sim > MATCH_THRESHOLD:
+                best_match_id = matched_person['id']
+                best_match_name = matched_person['name']
                 is_known = True
                 color = (0, 255, 0) # Green for known
                 label = f"{best_match_name} ({max_sim:.2f})"
@@ -78,28 +108,35 @@ def main():
                 # For simplicity: Update if status is 0 (OUT) OR if entry_time is old (> 60s ago)
                 current_time = time.time()
                 
-                # We need to find the person dict in known_persons to check status
-                matched_person = next((p for p in known_persons if p['id'] == best_match_id), None)
+                if matched_person['status'] == 0 or (current_time - matched_person['entry_time'] > 60):
+                    db.update_status(best_match_id, 1)
+                    print(f"Welcome back, {best_match_name}! Marked IN.")
+                    
+                    # Update local cache to prevent immediate re-update
+                    matched_person['status'] = 1
+                    matched_person['entry_time'] = current_time
                 
-                if matched_person:
-                    if matched_person['status'] == 0 or (current_time - matched_person['entry_time'] > 60):
-                        db.update_status(best_match_id, 1)
-                        print(f"Welcome back, {best_match_name}! Marked IN.")
-                        
-                        # Update local cache to prevent immediate re-update
-                        matched_person['status'] = 1
-                        matched_person['entry_time'] = current_time
+                strangers.discard(track_id)
             else:
                 is_known = False
                 color = (0, 0, 255) # Red for stranger
                 label = f"Stranger ({max_sim:.2f})"
+                
+                # Buffer this track's features for registration (bigger crop = better face)
+                if current_feature is not None and track_id not in pending_tracks:
+                    area = (x2 - x1) * (y2 - y1)
+                    strangers.add(track_id, current_feature, area)
             
             cv2.rectangle(frame_resized, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
             cv2.putText(frame_resized, label, (int(x1), int(y1)-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
 
-            if not is_known:
+            if track_id in pending_tracks:
+                cv2.putText(frame_resized, "Enrolling... (enter name in console)", (int(x1), int(y2)+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            elif not is_known:
                 cv2.putText(frame_resized, "Press 'r' to Register", (int(x1), int(y2)+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
 
+        strangers.prune()
+        
         cv2.imshow("Entry Camera", frame_resized)
         
         key = cv2.waitKey(1) & 0xFF
@@ -107,53 +144,16 @@ def main():
         if key == ord('q'):
             break
         elif key == ord('r'):
-             # REGISTRATION MODE
-             # Filter tracks to find STRANGERS only
-             found_stranger = False
-             
-             candidates = []
-             for track in tracks:
-                 bbox = track[:4]
-                 feat = reid.extract_features(frame_resized, bbox)
-                 
-                 # Check against DB
-                 sim_max = 0
-                 if feat is not None:
-                     for p in known_persons:
-                         s = reid.compute_similarity(feat, p['embedding'])
-                         if s > sim_max: sim_max = s
-                 
-                 if sim_max < MATCH_THRESHOLD:
-                     area = (bbox[2]-bbox[0]) * (bbox[3]-bbox[1])
-                     candidates.append((area, feat))
+            # REGISTRATION: queue the visible stranger with the best buffered
+            # features; recognition keeps running while the name is entered.
+            visible = [t[4] for t in tracks if t[4] not in pending_tracks]
+            target_track = strangers.best_track(visible)
             
-             candidates.sort(key=lambda x: x[0], reverse=True)
-             
-             if candidates:
-                 target_feat = candidates[0][1]
-                 # Pause display
-                 cv2.putText(frame_resized, "PAUSED FOR REGISTRATION", (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 3)
-                 cv2.imshow("Entry Camera", frame_resized)
-                 cv2.waitKey(1)
-                 
-                 print("\n--- NEW REGISTRATION ---")
-                 name = input("Enter Person Name: ").strip()
-                 
-                 # Check for duplicate name
-                 name_exists = any(p['name'].lower() == name.lower() for p in known_persons)
-                 
-                 if name and not name_exists:
-                     pid = db.add_person(name, target_feat)
-                     print(f"Registered {name} (ID: {pid}).")
-                 elif name_exists:
-                     # Add to existing person
-                     pid = next(p['id'] for p in known_persons if p['name'].lower() == name.lower())
-                     db.add_embedding(pid, target_feat)
-                     print(f"Added new embedding for existing person {name} (ID: {pid}).")
-                 else:
-                     print("Cancelled.")
-             else:
-                 print("No stranger detected to register (or they are already known).")
+            if target_track is not None:
+                pending_tracks.add(target_track)
+                enrollments.submit(target_track, strangers.take(target_track))
+            else:
+                print("No stranger detected to register (or they are already known).")
 
     cap.release()
     cv2.destroyAllWindows()
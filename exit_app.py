@@ -5,6 +5,7 @@ import numpy as np
 from src.detector import PersonDetector
 from src.reid import ReIdentifier
 from src.database import Database
+from src.client import RecognitionClient
 
 import argparse
 
@@ -12,6 +13,7 @@ def main():
     # Configuration
     parser = argparse.ArgumentParser()
     parser.add_argument("--source", type=str, default="0", help="Camera Source (0, 1, or video file)")
+    parser.add_argument("--server", type=str, default=None, help="Use a running recognition server (host:port or unix:/path) instead of loading models")
     args = parser.parse_args()
     
     # Convert to int if digit
@@ -20,7 +22,7 @@ def main():
     MATCH_THRESHOLD = 0.65 
     
     detector = PersonDetector()
-    reid = ReIdentifier()
+    reid = RecognitionClient(args.server) if args.server else ReIdentifier()
     db = Database()
     
     print(f"Attempting to open source: {SOURCE}")
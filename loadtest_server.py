@@ -0,0 +1,86 @@
+
+import time
+import argparse
+import threading
+import cv2
+import numpy as np
+from src.client import RecognitionClient
+
+def worker(address, image, aligned, n_requests, latencies, errors):
+    client = RecognitionClient(address, timeout=30.0)
+    try:
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            try:
+                client.embed(image, aligned=aligned)
+            except (OSError, RuntimeError):
+                errors.append(1)
+                continue
+            latencies.append(time.perf_counter() - start)
+    finally:
+        client.close()
+
+def run_level(address, image, aligned, concurrency, n_requests):
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=worker, args=(address, image, aligned, n_requests, latencies, errors))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return np.array(latencies) * 1000.0, len(errors), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the recognition server: latency percentiles vs concurrency.")
+    parser.add_argument("--server", type=str, default="127.0.0.1:8765", help="host:port or unix:/path")
+    parser.add_argument("--image", type=str, required=True,
+                        help="Real person crop to send, as the apps do (must contain a detectable face)")
+    parser.add_argument("--paths", type=str, default="detect,aligned",
+                        help="Comma separated: 'detect' (MTCNN + batched embedding, the apps' path) "
+                             "and/or 'aligned' (face pre-aligned on the client, batched embedding only)")
+    parser.add_argument("--concurrency", type=str, default="1,2,4,8,16,32", help="Comma separated client counts")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client at each level")
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image)
+    if image is None:
+        print(f"Error: could not read '{args.image}'.")
+        return
+
+    # 'aligned' skips MTCNN, so it only shows what batching does for the forward pass
+    workloads = {'detect': (image, False), 'aligned': (cv2.resize(image, (160, 160)), True)}
+
+    stats_client = RecognitionClient(args.server)
+    # Warm up (first forward pass is slow on GPU)
+    if stats_client.embed(image) is None:
+        print(f"Error: no face detected in '{args.image}'; the detect path would never reach the embedding model.")
+        stats_client.close()
+        return
+
+    print(f"\n{'Path':<8} {'Clients':<8} {'Req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'Batch':>6} {'Errors':>7}")
+    print("-" * 79)
+    for path in args.paths.split(","):
+        request_image, aligned = workloads[path]
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            before = stats_client.stats()
+            latencies, errors, elapsed = run_level(args.server, request_image, aligned, concurrency, args.requests)
+            after = stats_client.stats()
+
+            batches = after['batches'] - before['batches']
+            mean_batch = (after['items'] - before['items']) / batches if batches else 0.0
+            if len(latencies):
+                p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+                worst = latencies.max()
+            else:
+                p50 = p90 = p99 = worst = float('nan')
+            print(f"{path:<8} {concurrency:<8} {len(latencies) / elapsed:>8.1f} {p50:>8.1f} {p90:>8.1f} {p99:>8.1f} "
+                  f"{worst:>8.1f} {mean_batch:>6.1f} {errors:>7}")
+        print("-" * 79)
+
+    stats_client.close()
+
+if __name__ == "__main__":
+    main()
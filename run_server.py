@@ -0,0 +1,34 @@
+
+import asyncio
+import argparse
+from src.reid import ReIdentifier
+from src.database import Database
+from src.server import RecognitionServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local face recognition server.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind (keep it local)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--socket", type=str, default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=16, help="Max faces per embedding forward pass")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Max time a face waits for its batch to fill")
+    parser.add_argument("--detect-workers", type=int, default=1,
+                        help="Threads running face detection (MTCNN); with 1 detection is serialized")
+    parser.add_argument("--threshold", type=float, default=0.65, help="Match threshold for 'identify'")
+    args = parser.parse_args()
+
+    reid = ReIdentifier()
+    db = Database()
+    server = RecognitionServer(reid, db, match_threshold=args.threshold,
+                               max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms,
+                               detect_workers=args.detect_workers)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+
+import base64
+import json
+import socket
+
+import cv2
+import numpy as np
+
+class RecognitionClient:
+    def __init__(self, address="127.0.0.1:8765", timeout=5.0):
+        """
+        Thin client for the local recognition server (see run_server.py).
+        Exposes the same extract_features/compute_similarity interface as
+        ReIdentifier, so the apps can use either without loading models.
+        Args:
+            address (str): 'host:port' or 'unix:/path/to/socket'.
+            timeout (float): Socket timeout in seconds.
+        """
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self.stream = None
+
+    def connect(self):
+        if self.address.startswith("unix:"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address[len("unix:"):])
+        else:
+            host, port = self.address.rsplit(":", 1)
+            sock = socket.create_connection((host, int(port)), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.stream = sock.makefile("rb")
+
+    def close(self):
+        if self.sock is not None:
+            self.stream.close()
+            self.sock.close()
+        self.sock = None
+        self.stream = None
+
+    def request(self, payload):
+        """
+        Send one request and wait for its response.
+        Raises:
+            ConnectionError: If the server is unreachable or closes the connection.
+            RuntimeError: If the server reports an error.
+        """
+        if self.sock is None:
+            self.connect()
+        try:
+            self.sock.sendall(json.dumps(payload).encode() + b'\n')
+            line = self.stream.readline()
+        except OSError:
+            # Drop the connection so the next call reconnects
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionError("recognition server closed the connection")
+
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'unknown error'))
+        return response
+
+    @staticmethod
+    def encode_image(image):
+        ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        if not ok:
+            raise ValueError("could not encode image")
+        return base64.b64encode(buf.tobytes()).decode('ascii')
+
+    @staticmethod
+    def _to_array(embedding):
+        return None if embedding is None else np.asarray(embedding, dtype=np.float32)
+
+    def embed(self, image, aligned=False):
+        """
+        Args:
+            image (numpy.ndarray): Person crop (BGR), or a 160x160 face if aligned=True.
+        Returns:
+            numpy.ndarray: 512-dim feature vector, or None if no face found.
+        """
+        response = self.request({'op': 'embed', 'image': self.encode_image(image), 'aligned': aligned})
+        return self._to_array(response['embedding'])
+
+    def identify(self, image, threshold=None):
+        """
+        Returns:
+            dict: {'embedding', 'person_id', 'name', 'similarity'}; person_id/name are None for strangers.
+        """
+        payload = {'op': 'identify', 'image': self.encode_image(image)}
+        if threshold is not None:
+            payload['threshold'] = threshold
+        response = self.request(payload)
+        response['embedding'] = self._to_array(response['embedding'])
+        return response
+
+    def enroll(self, name, embedding=None, image=None):
+        """Register an embedding (or the face in image) under name. Returns the person ID."""
+        payload = {'op': 'enroll', 'name': name}
+        if embedding is not None:
+            payload['embedding'] = np.asarray(embedding).tolist()
+        else:
+            payload['image'] = self.encode_image(image)
+        return self.request(payload)['person_id']
+
+    def stats(self):
+        return self.request({'op': 'stats'})
+
+    def extract_features(self, frame, bbox):
+        """
+        Drop-in replacement for ReIdentifier.extract_features.
+        Only the person crop is sent to the server.
+        """
+        x1, y1, x2, y2 = map(int, bbox)
+        h, w, _ = frame.shape
+        x1 = max(0, x1)
+        y1 = max(0, y1)
+        x2 = min(w, x2)
+        y2 = min(h, y2)
+
+        if x1 >= x2 or y1 >= y2:
+            return None
+
+        try:
+            return self.embed(frame[y1:y2, x1:x2])
+        except (OSError, RuntimeError) as e:
+            print(f"Recognition server error: {e}")
+            return None
+
+    @staticmethod
+    def compute_similarity(feat1, feat2):
+        """
+        Compute Cosine Similarity between two feature vectors.
+        """
+        if feat1 is None or feat2 is None:
+            return 0.0
+        return np.dot(feat1, feat2)
@@ -60,7 +60,12 @@ class Database:
         except sqlite3.IntegrityError:
             # Name already exists
             self.cursor.execute('SELECT id FROM persons WHERE name = ?', (name,))
-            return self.cursor.fetchone()[0]
+            person_id = self.cursor.fetchone()[0]
+            
+            if embedding is not None:
+                self.add_embedding(person_id, embedding)
+            
+            return person_id
 
     def add_embedding(self, person_id, embedding):
         """Add an embedding for an existing person."""
@@ -100,6 +105,15 @@ class Database:
             })
         return results
 
+    def get_statuses(self):
+        """Retrieve (id, status, entry_time, embedding count) for every person, without the embeddings."""
+        self.cursor.execute('''
+            SELECT p.id, p.status, p.entry_time, COUNT(e.id)
+            FROM persons p LEFT JOIN embeddings e ON e.person_id = p.id
+            GROUP BY p.id
+        ''')
+        return self.cursor.fetchall()
+
     def get_person(self, person_id):
          self.cursor.execute('SELECT id, name, status, entry_time FROM persons WHERE id = ?', (person_id,))
          return self.cursor.fetchone()
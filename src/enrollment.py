@@ -0,0 +1,87 @@
+
+import queue
+import threading
+import time
+
+class StrangerBuffer:
+    def __init__(self, max_features=5, max_age=10.0):
+        """
+        Keep the best-quality features seen for each unrecognized track, so
+        registration does not have to re-extract anything.
+        Args:
+            max_features (int): Features kept per track (highest quality first).
+            max_age (float): Seconds after which an unseen track is dropped.
+        """
+        self.max_features = max_features
+        self.max_age = max_age
+        # {track_id: {'features': [(quality, feature)], 'last_seen': time}}
+        self.tracks = {}
+
+    def add(self, track_id, feature, quality):
+        """Offer a feature for a track; kept only if it is among the best for that track."""
+        entry = self.tracks.setdefault(track_id, {'features': [], 'last_seen': 0})
+        entry['last_seen'] = time.time()
+        features = entry['features']
+        features.append((quality, feature))
+        features.sort(key=lambda x: x[0], reverse=True)
+        del features[self.max_features:]
+
+    def discard(self, track_id):
+        self.tracks.pop(track_id, None)
+
+    def best_track(self, track_ids):
+        """Among the given (visible) tracks, return the buffered one with the best feature, or None."""
+        candidates = [t for t in track_ids if t in self.tracks]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda t: self.tracks[t]['features'][0][0])
+
+    def take(self, track_id):
+        """Remove a track from the buffer and return its features (best first)."""
+        entry = self.tracks.pop(track_id)
+        return [feature for _, feature in entry['features']]
+
+    def prune(self):
+        now = time.time()
+        for track_id in [t for t, e in self.tracks.items() if now - e['last_seen'] > self.max_age]:
+            del self.tracks[track_id]
+
+class EnrollmentQueue:
+    def __init__(self, prompt=input):
+        """
+        Collect names for queued registrations on a background thread, so the
+        camera loop keeps running while someone types.
+        Args:
+            prompt (callable): Reads a name; called only from the worker thread.
+        """
+        self.prompt = prompt
+        self.requests = queue.Queue()
+        self.completed = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, track_id, features):
+        self.requests.put((track_id, features))
+
+    def _run(self):
+        while True:
+            track_id, features = self.requests.get()
+            print(f"\n--- NEW REGISTRATION (track {track_id}, {len(features)} samples) ---")
+            try:
+                name = self.prompt("Enter Person Name (empty to cancel): ").strip()
+            except EOFError:
+                name = ""
+            self.completed.put((track_id, name, features))
+
+    def poll(self):
+        """
+        Return registrations whose name has been entered, without blocking.
+        Returns:
+            list: [(track_id, name, features)]; name is empty if cancelled.
+        """
+        done = []
+        while True:
+            try:
+                done.append(self.completed.get_nowait())
+            except queue.Empty:
+                return done
@@ -0,0 +1,120 @@
+
+import numpy as np
+
+class Gallery:
+    def __init__(self, db):
+        """
+        In-memory copy of the registered persons and their embeddings.
+        Args:
+            db (Database): Database the gallery is loaded from and enrolls into.
+        """
+        self.db = db
+        self.persons = []
+        self._matrix = None
+        self._owners = None
+        self.reload()
+
+    def reload(self):
+        """Re-read all persons and embeddings from the database."""
+        self.persons = self.db.get_all_embeddings()
+        self._matrix = None
+
+    def get(self, person_id):
+        return next((p for p in self.persons if p['id'] == person_id), None)
+
+    def find_by_name(self, name):
+        """Case-insensitive lookup by name."""
+        return next((p for p in self.persons if p['name'].lower() == name.lower()), None)
+
+    def _build_index(self):
+        # Stack every embedding into one matrix so a match is a single matrix-vector product
+        embeddings = []
+        owners = []
+        for idx, person in enumerate(self.persons):
+            for emb in person['embeddings']:
+                embeddings.append(emb)
+                owners.append(idx)
+        if embeddings:
+            self._matrix = np.vstack(embeddings)
+            self._owners = np.array(owners)
+        else:
+            self._matrix = np.empty((0, 0))
+            self._owners = np.empty(0, dtype=int)
+
+    def match(self, feature):
+        """
+        Find the closest registered person.
+        Args:
+            feature (numpy.ndarray): Normalized 512-dim feature vector.
+        Returns:
+            tuple: (person dict or None, best cosine similarity)
+        """
+        if feature is None:
+            return None, 0.0
+        if self._matrix is None:
+            self._build_index()
+        if len(self._owners) == 0:
+            return None, 0.0
+
+        sims = self._matrix @ feature
+        best = int(np.argmax(sims))
+        return self.persons[self._owners[best]], float(sims[best])
+
+    def push(self, person_id, embedding):
+        """
+        Add an embedding that is already stored in the database to the
+        in-memory gallery only (e.g. one enrolled through the recognition server).
+        """
+        person = self.get(person_id)
+        if person is None:
+            row = self.db.get_person(person_id)
+            if row is None:
+                # Deleted in the meantime (e.g. manage_db.py); resync instead of guessing
+                self.reload()
+                return
+            person = {
+                'id': person_id,
+                'name': row[1],
+                'embeddings': [],
+                'status': row[2],
+                'entry_time': row[3]
+            }
+            self.persons.append(person)
+        person['embeddings'].append(embedding)
+        self._matrix = None
+
+    def enroll(self, name, embedding):
+        """
+        Register an embedding under a name, creating the person if needed.
+        The database and the in-memory gallery are both updated, so the new
+        embedding is matchable immediately without a reload.
+        Returns:
+            int: Person ID.
+        """
+        person = self.find_by_name(name)
+        if person is None:
+            # The person may have been registered by another app since the last load
+            self.refresh_status()
+            person = self.find_by_name(name)
+        if person is not None:
+            person_id = person['id']
+            self.db.add_embedding(person_id, embedding)
+        else:
+            person_id = self.db.add_person(name, embedding)
+        self.push(person_id, embedding)
+        return person_id
+
+    def refresh_status(self):
+        """
+        Pick up IN/OUT changes made by other apps without reloading embeddings.
+        Falls back to a full reload if persons or embeddings were added or
+        removed elsewhere.
+        """
+        rows = self.db.get_statuses()
+        by_id = {p['id']: p for p in self.persons}
+        if len(rows) != len(by_id) or any(r[0] not in by_id or r[3] != len(by_id[r[0]]['embeddings']) for r in rows):
+            self.reload()
+            return
+        for p_id, status, entry_time, _ in rows:
+            by_id[p_id]['status'] = status
+            by_id[p_id]['entry_time'] = entry_time
@@ -35,6 +35,30 @@ class ReIdentifier:
         if self.mtcnn is None or self.resnet is None:
             return None
 
+        try:
+            face_tensor = self.detect_face(frame, bbox)
+            
+            if face_tensor is not None:
+                return self.embed_faces([face_tensor])[0]
+            else:
+                # No face detected in this person crop
+                return None
+        except Exception as e:
+            # print(f"ReID Error: {e}") 
+            return None
+
+    def detect_face(self, frame, bbox):
+        """
+        Detect and align the face inside a person crop (MTCNN stage only).
+        Args:
+            frame (numpy.ndarray): Full image frame (BGR).
+            bbox (list): Person Bounding box [x1, y1, x2, y2].
+        Returns:
+            torch.Tensor: Aligned face of shape (3, 160, 160), or None if no face found.
+        """
+        if self.mtcnn is None:
+            return None
+
         x1, y1, x2, y2 = map(int, bbox)
         h, w, _ = frame.shape
         x1 = max(0, x1)
@@ -47,34 +71,47 @@ class ReIdentifier:
 
         person_crop = frame[y1:y2, x1:x2]
         
-        try:
-            # Convert to PIL for MTCNN
-            img = Image.fromarray(person_crop[..., ::-1]) # BGR to RGB
-            
-            # Detect and crop face
-            # mtcnn(img) returns tensor of shape (3, 160, 160)
-            face_tensor = self.mtcnn(img)
-            
-            if face_tensor is not None:
-                # Add batch dim
-                face_tensor = face_tensor.unsqueeze(0).to(self.device)
-                
-                # Embedding
-                with torch.no_grad():
-                    embedding = self.resnet(face_tensor).squeeze().cpu().numpy()
-                
-                # Normalize (Facenet output is usually normalized, but let's be safe)
-                norm = np.linalg.norm(embedding)
-                if norm > 0:
-                    embedding = embedding / norm
-                    
-                return embedding
-            else:
-                # No face detected in this person crop
-                return None
-        except Exception as e:
-            # print(f"ReID Error: {e}") 
-            return None
+        # Convert to PIL for MTCNN
+        img = Image.fromarray(person_crop[..., ::-1]) # BGR to RGB
+        
+        # Detect and crop face
+        # mtcnn(img) returns tensor of shape (3, 160, 160)
+        return self.mtcnn(img)
+
+    @staticmethod
+    def prepare_aligned_face(face):
+        """
+        Convert an already aligned face image into the tensor layout MTCNN produces.
+        Args:
+            face (numpy.ndarray): Aligned face crop (BGR), resized to 160x160 if needed.
+        Returns:
+            torch.Tensor: Standardized face of shape (3, 160, 160).
+        """
+        img = Image.fromarray(np.ascontiguousarray(face[..., ::-1])) # BGR to RGB
+        if img.size != (160, 160):
+            img = img.resize((160, 160))
+        rgb = np.asarray(img, dtype=np.float32)
+        # Same standardization MTCNN applies with post_process=True
+        return (torch.from_numpy(rgb).permute(2, 0, 1) - 127.5) / 128.0
+
+    def embed_faces(self, face_tensors):
+        """
+        Run InceptionResnetV1 on a batch of aligned faces in a single forward pass.
+        Args:
+            face_tensors (list): Aligned face tensors of shape (3, 160, 160).
+        Returns:
+            numpy.ndarray: (N, 512) array of L2-normalized embeddings.
+        """
+        batch = torch.stack(list(face_tensors)).to(self.device)
+        
+        # Embedding
+        with torch.no_grad():
+            embeddings = self.resnet(batch).cpu().numpy()
+        
+        # Normalize (Facenet output is usually normalized, but let's be safe)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
 
     @staticmethod
     def compute_similarity(feat1, feat2):
@@ -0,0 +1,237 @@
+
+import asyncio
+import base64
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.gallery import Gallery
+
+# Large enough for a base64 encoded full frame on a single line
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+# InceptionResnetV1 output size
+EMBEDDING_DIM = 512
+
+class MicroBatcher:
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0, executor=None):
+        """
+        Coalesce concurrent requests into micro-batches.
+        Args:
+            batch_fn (callable): Takes a list of items and returns a list of results (same order).
+            max_batch_size (int): Upper bound on items per call to batch_fn.
+            max_wait_ms (float): How long the first item of a batch waits for company.
+            executor (Executor): Where batch_fn runs, so the event loop is never blocked.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """Queue an item and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+class RecognitionServer:
+    def __init__(self, reid, db, match_threshold=0.65, max_batch_size=16, max_wait_ms=5.0, detect_workers=1):
+        """
+        Local recognition service sharing one set of models and one gallery.
+        Speaks newline-delimited JSON over TCP (localhost) or a Unix socket.
+        Args:
+            reid (ReIdentifier): Loaded face models.
+            db (Database): Database backing the gallery.
+            match_threshold (float): Minimum similarity for 'identify' to report a match.
+            max_batch_size (int): Max faces per InceptionResnetV1 forward pass.
+            max_wait_ms (float): Max time a face waits for a batch to fill.
+            detect_workers (int): Threads running MTCNN. With 1, detection is
+                serialized and caps throughput of embed/identify/enroll requests
+                that are not pre-aligned, however large the batches get.
+        """
+        self.reid = reid
+        self.gallery = Gallery(db)
+        self.match_threshold = match_threshold
+        # MTCNN and the embedding forward run on separate threads so
+        # detection of the next requests overlaps the current batch.
+        self.detect_executor = ThreadPoolExecutor(max_workers=detect_workers)
+        self.embed_executor = ThreadPoolExecutor(max_workers=1)
+        self.batcher = MicroBatcher(reid.embed_faces, max_batch_size, max_wait_ms, self.embed_executor)
+        self.handlers = {
+            'embed': self.handle_embed,
+            'identify': self.handle_identify,
+            'enroll': self.handle_enroll,
+            'reload': self.handle_reload,
+            'stats': self.handle_stats,
+        }
+
+    @staticmethod
+    def decode_image(data):
+        """Decode a base64 encoded JPEG/PNG into a BGR image."""
+        buf = np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+        img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("could not decode image")
+        return img
+
+    async def embed_image(self, request):
+        """Detect (unless pre-aligned) and embed the image in a request."""
+        img = self.decode_image(request['image'])
+        loop = asyncio.get_running_loop()
+        if request.get('aligned'):
+            face = self.reid.prepare_aligned_face(img)
+        else:
+            h, w, _ = img.shape
+            face = await loop.run_in_executor(self.detect_executor, self.reid.detect_face, img, [0, 0, w, h])
+        if face is None:
+            return None
+        return await self.batcher.submit(face)
+
+    async def handle_embed(self, request):
+        embedding = await self.embed_image(request)
+        return {'embedding': None if embedding is None else embedding.tolist()}
+
+    @staticmethod
+    def parse_embedding(values):
+        """Validate a client supplied embedding and L2-normalize it."""
+        embedding = np.asarray(values, dtype=np.float32)
+        if embedding.shape != (EMBEDDING_DIM,):
+            raise ValueError(f"embedding must be a list of {EMBEDDING_DIM} numbers")
+        if not np.all(np.isfinite(embedding)):
+            raise ValueError("embedding contains non-finite values")
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            raise ValueError("embedding is all zeros")
+        return embedding / norm
+
+    async def handle_identify(self, request):
+        embedding = await self.embed_image(request)
+        # Pick up persons registered or IN/OUT changes made by other apps
+        self.gallery.refresh_status()
+        person, sim = self.gallery.match(embedding)
+        threshold = request.get('threshold', self.match_threshold)
+        matched = person is not None and sim > threshold
+        return {
+            'embedding': None if embedding is None else embedding.tolist(),
+            'person_id': person['id'] if matched else None,
+            'name': person['name'] if matched else None,
+            'similarity': sim
+        }
+
+    async def handle_enroll(self, request):
+        name = request.get('name', '').strip()
+        if not name:
+            raise ValueError("name is required")
+        if request.get('embedding') is not None:
+            embedding = self.parse_embedding(request['embedding'])
+        else:
+            embedding = await self.embed_image(request)
+            if embedding is None:
+                raise ValueError("no face found")
+        person_id = self.gallery.enroll(name, embedding)
+        print(f"Enrolled {name} (ID: {person_id}).")
+        return {'person_id': person_id}
+
+    async def handle_reload(self, request):
+        self.gallery.reload()
+        return {'persons': len(self.gallery.persons)}
+
+    async def handle_stats(self, request):
+        batches = self.batcher.batches
+        return {
+            'batches': batches,
+            'items': self.batcher.items,
+            'mean_batch_size': self.batcher.items / batches if batches else 0.0,
+            'persons': len(self.gallery.persons)
+        }
+
+    async def dispatch(self, request):
+        handler = self.handlers.get(request.get('op'))
+        if handler is None:
+            raise ValueError(f"unknown op: {request.get('op')}")
+        return await handler(request)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = {}
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        request = {}
+                        raise ValueError("request must be a JSON object")
+                    response = await self.dispatch(request)
+                    response['ok'] = True
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                if 'id' in request:
+                    response['id'] = request['id']
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Peer went away or sent a line longer than MAX_LINE_BYTES
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        """Start listening and serve until cancelled."""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(self.handle_connection, path=socket_path, limit=MAX_LINE_BYTES)
+            print(f"Recognition server listening on unix:{socket_path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+            print(f"Recognition server listening on {host}:{port}")
+
+        batcher_task = asyncio.create_task(self.batcher.run())
+        started = time.time()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self.detect_executor.shutdown(wait=False)
+            self.embed_executor.shutdown(wait=False)
+            print(f"Recognition server stopped after {time.time() - started:.0f}s "
+                  f"({self.batcher.items} faces in {self.batcher.batches} batches).")